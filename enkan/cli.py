@@ -1,6 +1,7 @@
 # ——— Standard library ———
 import os
 import logging
+from array import array
 from typing import List
 from itertools import accumulate
 
@@ -27,6 +28,8 @@ def main_with_args(args) -> None:
         input_files: List[str] = []
     elif isinstance(args.input_file, str):
         input_files = [args.input_file]
+    elif isinstance(args.input_file, list):
+        input_files = args.input_file
     else:
         input_files = list(args.input_file)
 
@@ -65,7 +68,10 @@ def main_with_args(args) -> None:
         all_images.extend(extracted_images)
         weights.extend(extracted_weights)
         
-    cum_weights = list(accumulate(weights))
+    # Packed doubles: 8 B per entry against ~32 B per entry for a list of
+    # floats (pointer plus float object), about a quarter of the memory; and
+    # bisect/random.choices index into it directly
+    cum_weights = array("d", accumulate(weights))
 
     if args.outputlist:
         from enkan.utils.utils import write_image_list
@@ -13,12 +13,17 @@ PARENT_STACK_MAX = 5
 HISTORY_QUEUE_LENGTH = 25
 CACHE_SIZE = 10
 PRELOAD_QUEUE_LENGTH = 3
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+PICKLE_PROTOCOL = 5
 IMAGE_FILES = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff")
 VIDEO_FILES = (".mp4", ".mkv", ".webm", ".avi", ".mov", ".wmv")
 TEXT_FILES = (".txt", ".lst")
 CX_PATTERN = re.compile(r"^(?:[bw]\d+(?:,-?\d+)?(?:,-?\d+)?)+$", re.IGNORECASE)
 
 MODIFIER_PATTERN = re.compile(r"(\[.*?\])")
+# Same spans as MODIFIER_PATTERN, capturing the trimmed text inside the brackets
+MODIFIER_CONTENT_PATTERN = re.compile(r"\[\[*\s*(.*?)\s*\]")
 WEIGHT_MODIFIER_PATTERN = re.compile(r"^\d+%?$")
 PROPORTION_PATTERN = re.compile(r"^%\d+%?$")
 MODE_PATTERN = CX_PATTERN
@@ -2,10 +2,12 @@
 import os
 import sys
 import random
+from array import array
 import tkinter as tk
 from tkinter import messagebox
 from itertools import accumulate
 import logging
+from typing import Sequence
 
 # ——— Third-party ———
 import vlc
@@ -39,7 +41,7 @@ class ImageSlideshow:
         root: TreeNode,
         tree: Tree,
         image_paths: list,
-        cum_weights: list,
+        cum_weights: Sequence[float],
         defaults: Defaults,
         filters: Filters,
         quiet: bool,
@@ -48,8 +50,8 @@ class ImageSlideshow:
         self.root: TreeNode = root
         self.original_tree: Tree = tree
         self.image_paths: list = image_paths
-        self.cum_weights: list = cum_weights
-        self.original_cum_weights: list = cum_weights
+        self.cum_weights: Sequence[float] = cum_weights
+        self.original_cum_weights: Sequence[float] = cum_weights
         self.original_image_paths: list = image_paths
         self.number_of_images: int = len(image_paths)
         self.current_image_index = 0
@@ -73,6 +75,15 @@ class ImageSlideshow:
         self.rotation_angle: int | float = 0
         self.current_exif_orientation: int = 1
 
+        # Created on demand (first video / auto-advance), but always defined so
+        # the per-image paths can test them directly
+        self.video_player = None
+        self.video_frame: tk.Frame | None = None
+        self.vlc_instance = None
+        self.auto_advance_running: bool = False
+        self.auto_advance_id = None
+        self.auto_advance_interval: int | float = 5000
+
         self.root.configure(background="black")  # Set root background to black
         self.label = tk.Label(root, bg="black")  # Set label background to black
         self.label.pack()
@@ -86,6 +97,9 @@ class ImageSlideshow:
             highlightthickness=0,
         )
         self.filename_label.config(state=tk.DISABLED)
+        # Tag colours that never change; only "fixed" is set per update
+        self.filename_label.tag_configure("normal", foreground="white")
+        self.filename_label.tag_configure("meta", foreground="white")
         self.mode_label = tk.Label(self.root, bg="black", fg="white", anchor="ne")
 
         # Zoom/Pan controller (binds mouse events on the label)
@@ -143,7 +157,7 @@ class ImageSlideshow:
             self.set_provider("random")
         else:
             self.set_provider("weighted", cum_weights=self.cum_weights)
-        self.mode, _ = resolve_mode(self.defaults.mode, min(self.defaults.mode.keys()))
+        self.mode, _ = resolve_mode(self.defaults.mode, self.defaults.lowest_rung)
 
         self.show_image()
         if interval:
@@ -154,7 +168,7 @@ class ImageSlideshow:
     def _reset_zoom(self, event=None) -> None:
         self.zoompan.reset_view()
 
-    def update_slide_show(self, image_paths: list, cum_weights: list) -> None:
+    def update_slide_show(self, image_paths: list, cum_weights: Sequence[float]) -> None:
         """Updates the slideshow with the new set of images and weights."""
         self.image_paths = image_paths
         self.cum_weights = cum_weights
@@ -169,11 +183,11 @@ class ImageSlideshow:
 
     def show_image(self, image_path: str = None, record_history: bool = True) -> None:
         # Stop existing video playback and clean up resources
-        if hasattr(self, "video_player") and self.video_player:
+        if self.video_player:
             self.video_player.stop()
             self.video_player.release()
             self.video_player = None
-        if hasattr(self, "video_frame"):
+        if self.video_frame is not None:
             self.video_frame.place_forget()
 
         image_path, image = self.manager.get_next(
@@ -186,7 +200,7 @@ class ImageSlideshow:
         if image:
             self.current_exif_orientation = image.info.get("exif_orientation", 1)
             # If rotating, apply before handing to ZoomPan
-            if hasattr(self, "rotation_angle") and self.rotation_angle:
+            if self.rotation_angle:
                 image = image.rotate(self.rotation_angle, expand=True)
             # Provide full-resolution image to ZoomPan, which will fit & manage viewport
             self.zoompan.set_image(image)
@@ -199,14 +213,14 @@ class ImageSlideshow:
             self.zoompan.orig_image = None  # disable zoom state while video plays
             self.label.pack()
 
-            if not hasattr(self, "video_frame"):
+            if self.video_frame is None:
                 self.video_frame = tk.Frame(self.root, bg="black")
 
             self.video_frame.place(
                 x=0, y=0, width=self.screen_width, height=self.screen_height
             )
 
-            if not hasattr(self, "vlc_instance"):
+            if self.vlc_instance is None:
                 self.vlc_instance = vlc.Instance("--no-video-title-show", "--quiet")
 
             media = self.vlc_instance.media_new(image_path)
@@ -294,7 +308,7 @@ class ImageSlideshow:
             )
         else:
             logger.debug("No valid directory found.")
-        new_cum_weights: list[float] = list(accumulate(new_weights))
+        new_cum_weights: Sequence[float] = array("d", accumulate(new_weights))
         self.update_slide_show(new_image_paths, new_cum_weights)
 
     def _check_video_ended(self) -> None:
@@ -318,8 +332,8 @@ class ImageSlideshow:
         Toggle the automatic slideshow on/off.
         If enabling, optionally provide a new interval (ms).
         """
-        if getattr(self, "auto_advance_running", False):
-            if getattr(self, "auto_advance_id", None) is not None:
+        if self.auto_advance_running:
+            if self.auto_advance_id is not None:
                 self.root.after_cancel(self.auto_advance_id)
             self.auto_advance_id = None
             self.auto_advance_running = False
@@ -327,8 +341,6 @@ class ImageSlideshow:
         else:
             if interval is not None:
                 self.auto_advance_interval = interval
-            if not hasattr(self, "auto_advance_interval"):
-                self.auto_advance_interval = 5000
             self._schedule_next_image()
             self.auto_advance_running = True
             logger.debug("Auto-advance started (%s ms).", self.auto_advance_interval)
@@ -336,7 +348,7 @@ class ImageSlideshow:
         self.update_filename_display()
 
     def _schedule_next_image(self) -> None:
-        if getattr(self, "auto_advance_id", None) is not None:
+        if self.auto_advance_id is not None:
             self.root.after_cancel(self.auto_advance_id)
         self.auto_advance_id = self.root.after(
             self.auto_advance_interval, self._advance_image
@@ -348,7 +360,7 @@ class ImageSlideshow:
         self._schedule_next_image()
 
     def reset_auto_advance(self) -> None:
-        if getattr(self, "auto_advance_running", False):
+        if self.auto_advance_running:
             self._schedule_next_image()
 
     # -- Keyboard Hooks ---
@@ -392,11 +404,11 @@ class ImageSlideshow:
             )
             if confirm:
                 # Stop and release video player if a video is playing
-                if hasattr(self, "video_player") and self.video_player:
+                if self.video_player:
                     self.video_player.stop()
                     self.video_player.release()
                     self.video_player = None
-                if hasattr(self, "video_frame"):
+                if self.video_frame is not None:
                     self.video_frame.place_forget()
                 try:
                     os.remove(self.current_image_path)
@@ -505,7 +517,7 @@ class ImageSlideshow:
         return new_orientation
 
     def toggle_mute(self, event=None) -> None:
-        if hasattr(self, "video_player") and self.video_player:
+        if self.video_player:
             current_mute: bool = self.video_player.audio_get_mute()
             new_mute: bool = not current_mute
             self.video_player.audio_set_mute(new_mute)
@@ -563,7 +575,7 @@ class ImageSlideshow:
                 )
                 self.subfolder_mode = True
 
-        temp_cum_weights: list[int] = list(accumulate(temp_weights))
+        temp_cum_weights: Sequence[float] = array("d", accumulate(temp_weights))
         self.update_slide_show(
             image_paths=temp_image_paths, cum_weights=temp_cum_weights
         )
@@ -596,7 +608,7 @@ class ImageSlideshow:
         """Reset the current burst queue when running the burst provider."""
         if self.providers.get_current_provider_name() != "burst":
             return
-        if not getattr(self, "manager", None):
+        if not self.manager:
             return
         if self.manager.reset_provider():
             logger.debug("Burst cycle reset on demand.")
@@ -616,7 +628,7 @@ class ImageSlideshow:
         child_path = None
 
         if self.navigation_mode == "folder":
-            if utils.contains_subdirectory(current_top):
+            if utils.has_subdirectory(current_top):
                 current_path_level: int = utils.level_of(current_top)
                 child_level: int = current_path_level + 1
                 child_path: str = utils.truncate_path(current_path, child_level)
@@ -624,7 +636,7 @@ class ImageSlideshow:
                 if child_path == self.parentFolderStack.read_top(2):
                     self.step_backwards()
                     return
-                elif not utils.contains_subdirectory(child_path):
+                elif not utils.has_subdirectory(child_path):
                     self.toggle_subfolder_mode()
                 else:
                     self.parentFolderStack.push(
@@ -784,7 +796,7 @@ class ImageSlideshow:
             is_video: bool = utils.is_videofile(self.current_image_path)
             zoom_percent: int = (
                 self.zoompan.get_zoom_percent()
-                if hasattr(self, "zoompan") and self.zoompan
+                if self.zoompan
                 else 100
             )
             meta_parts = []
@@ -795,8 +807,6 @@ class ImageSlideshow:
             self.filename_label.insert(tk.END, meta_text, "meta")
 
             self.filename_label.tag_configure("fixed", foreground=fixed_colour)
-            self.filename_label.tag_configure("normal", foreground="white")
-            self.filename_label.tag_configure("meta", foreground="white")
             self.filename_label.place(x=0, y=0)
             full_label_text: str = self.filename_label.get("1.0", "end-1c")
             self.filename_label.config(
@@ -823,19 +833,14 @@ class ImageSlideshow:
                 mode_text = f"({self.current_image_index + 1}/{self.number_of_images}) {mode_text}"
 
             display_text: str = mode_text
-            if (
-                hasattr(self, "auto_advance_running")
-                and self.auto_advance_running
-                and hasattr(self, "auto_advance_interval")
-                and self.auto_advance_interval > 0
-            ):
+            if self.auto_advance_running and self.auto_advance_interval > 0:
                 display_text = f"AUTO ({self.auto_advance_interval}ms)   {mode_text}"
 
             self.mode_label.config(
                 text=display_text,
                 fg="white",
             )
-            self.mode_label.place(x=self.root.winfo_screenwidth(), y=0, anchor="ne")
+            self.mode_label.place(x=self.screen_width, y=0, anchor="ne")
         else:
             self.filename_label.place_forget()
             self.mode_label.place_forget()
@@ -846,13 +851,13 @@ class ImageSlideshow:
     def exit_slideshow(self, event=None) -> None:
         self.manager.lru_cache.clear()
         self.manager.preload_queue.clear()
-        if hasattr(self, "video_player") and self.video_player:
+        if self.video_player:
             self.video_player.stop()
             self.video_player.release()
             self.video_player = None
-        if hasattr(self, "vlc_instance") and self.vlc_instance:
+        if self.vlc_instance:
             self.vlc_instance.release()
             self.vlc_instance = None
-        if hasattr(self, "video_frame"):
+        if self.video_frame is not None:
             self.video_frame.destroy()
         self.root.destroy()
@@ -1,4 +1,5 @@
 import tkinter as tk
+from typing import Sequence
 
 from enkan.utils.Defaults import Defaults
 from enkan.utils.Filters import Filters
@@ -10,7 +11,7 @@ from .mySlideshow import ImageSlideshow
 def start_slideshow(
     tree: Tree, 
     all_image_paths: list,
-    cum_weights: list,
+    cum_weights: Sequence[float],
     defaults: Defaults, 
     filters: Filters, 
     quiet: bool, 
@@ -21,7 +22,7 @@ def start_slideshow(
 
     Args:
         all_image_paths (list): List of image paths.
-        weights (list): List of weights corresponding to image paths.
+        cum_weights (Sequence[float]): Cumulative weights corresponding to image paths.
         tree (Tree): Tree object containing the image hierarchy.
         defaults (object): Defaults object containing configuration.
     """
@@ -122,6 +122,7 @@ class ImageProviders:
                     include_video=include_video,
                     filters=filters,
                     ignored_files=ignored_files,
+                    copy=False,  # read-only: bursts build new lists from it
                 )
                 folder_cache[folder] = cached or []
             return cached or []
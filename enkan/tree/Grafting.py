@@ -56,6 +56,7 @@ class Grafting:
         # Detach and re-parent
         t.detach_node(current_node)
         parent_node.add_child(current_node)
+        t.invalidate_structure()
         t.rename_node_in_lookup(current_node.name, levelled_name)
         current_node.path = root  # Preserve original filesystem path
 
@@ -79,6 +80,7 @@ class Grafting:
                 parent = node.parent
                 if parent:
                     parent.children = [c for c in parent.children if c is not node]
+                    t.invalidate_structure()
                 t.node_lookup.pop(node.name, None)
                 node = parent
             else:
@@ -114,9 +116,10 @@ class Grafting:
             # Keys are absolute levels; assign only within this subtree.
             for lvl, mode in sorted(mode_mods.items()):
                 for node in anchor.get_nodes_at_level(lvl):
-                    # Merge or set mode modifier mapping
+                    # Merge or set mode modifier mapping (copied, as the
+                    # mapping may be shared with other nodes/input entries)
                     if isinstance(node.mode_modifier, dict):
-                        node.mode_modifier[lvl] = mode
+                        node.mode_modifier = {**node.mode_modifier, lvl: mode}
                     else:
                         node.mode_modifier = {lvl: mode}
 
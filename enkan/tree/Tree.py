@@ -2,16 +2,28 @@ from __future__ import annotations
 
 # ——— Standard library ———
 import os
-from typing import Any, Optional, Literal
+import sys
+from typing import Any, Optional
 
 # ——— Local ———
 from .TreeNode import TreeNode
 from enkan.utils.Defaults import Defaults
 from enkan.utils.Filters import Filters
 
+# Node attributes update_node may overwrite from node_data
+_UPDATABLE_NODE_FIELDS = (
+    "weight_modifier",
+    "is_percentage",
+    "proportion",
+    "mode_modifier",
+    "images",
+)
+
 
 class Tree:
     PICKLE_VERSION = 2
+    # Version a tree was unpickled with; pickles predating versioning read as 0
+    _pickle_version: int = 0
 
     def __init__(self, defaults: Defaults, filters: Filters) -> None:
         # Use string path, not int
@@ -28,17 +40,18 @@ class Tree:
         if not hasattr(self, "virtual_image_lookup"):
             self.virtual_image_lookup = {}
         # (Add future index repairs here)
+        # Derived caches are never pickled; rebuild lazily
+        self._preorder: list[TreeNode] | None = None
 
     def __getstate__(self) -> dict[str, Any]:
         state: dict[str, Any] = self.__dict__.copy()
+        state.pop("_preorder", None)
         state["_pickle_version"] = self.PICKLE_VERSION
         return state
 
     def __setstate__(self, state: dict[str, Any]) -> None:
         self.__dict__.update(state)
         self._post_init_indexes()
-        if "_pickle_version" not in self.__dict__:
-            self._pickle_version = 0
 
     def rename_children(self, parent_node: TreeNode, new_parent_name: str) -> None:
         for child in parent_node.children:
@@ -51,15 +64,15 @@ class Tree:
     def rename_node_in_lookup(self, old_name: str, new_name: str) -> None:
         node: Optional[TreeNode] = self.node_lookup.pop(old_name, None)
         if node is not None:
-            node.name = new_name
+            node.name = new_name = sys.intern(new_name)
             self.node_lookup[new_name] = node
 
     def create_node(self, path: str, node_data: dict | None = None) -> None:
-        parent_path: str = self.find_parent_name(path)
-        self.ensure_parent_exists(parent_path)
-        node_name: str = self.convert_path_to_tree_format(path)
+        # ensure_parent_exists returns the parent itself, so it needs no
+        # second name conversion and lookup before attaching the new node
+        parent_node: TreeNode = self.ensure_parent_exists(self.find_parent_name(path))
         new_node: TreeNode = TreeNode(
-            name=node_name,
+            name=self.convert_path_to_tree_format(path),
             path=path,
             weight_modifier=node_data["weight_modifier"],
             is_percentage=node_data["is_percentage"],
@@ -67,7 +80,7 @@ class Tree:
             mode_modifier=node_data["mode_modifier"],
             images=node_data["images"],
         )
-        self.add_node(new_node, self.convert_path_to_tree_format(parent_path))
+        self._attach_node(new_node, parent_node)
 
     def update_node(self, node: TreeNode, node_data: dict | None = None) -> None:
         """
@@ -81,33 +94,44 @@ class Tree:
         if node is None or not node_data:
             return
 
-        if "weight_modifier" in node_data:
-            node.weight_modifier = node_data["weight_modifier"]
-        if "is_percentage" in node_data:
-            node.is_percentage = node_data["is_percentage"]
-        if "proportion" in node_data:
-            node.proportion = node_data["proportion"]
-        if "mode_modifier" in node_data:
-            node.mode_modifier = node_data["mode_modifier"]
-        if "images" in node_data:
-            # Replace only if explicitly provided
-            node.images = node_data["images"]
+        for field in _UPDATABLE_NODE_FIELDS:
+            if field in node_data:
+                # Replace only if explicitly provided
+                setattr(node, field, node_data[field])
 
         """
         TODO: If later you want to merge images instead of replace, add a flag
               e.g. if node_data.get("append_images"): node.images.extend(...)
         """
 
+    def invalidate_structure(self) -> None:
+        """Drop caches derived from the tree's shape; call after re-parenting nodes."""
+        self._preorder = None
+
+    def preorder(self) -> list[TreeNode]:
+        """
+        Return every node in pre-order (parents before children, siblings in
+        insertion order). The list is cached until the tree's shape changes.
+        """
+        if self._preorder is None:
+            self._preorder = list(self.root.iter_preorder())
+        return self._preorder
+
     def detach_node(self, node: TreeNode) -> None:
         if node.parent:
             node.parent.children = [c for c in node.parent.children if c is not node]
             node.parent = None
+            self.invalidate_structure()
 
     def add_node(self, new_node: TreeNode, parent_node_name: str) -> None:
         parent_node: Optional[TreeNode] = self.find_node(parent_node_name)
         if parent_node is None:
             raise ValueError(f"Parent node '{parent_node_name}' not found.")
+        self._attach_node(new_node, parent_node)
+
+    def _attach_node(self, new_node: TreeNode, parent_node: TreeNode) -> None:
         parent_node.add_child(new_node)
+        self.invalidate_structure()
         self.node_lookup[new_node.name] = new_node
         self.path_lookup[new_node.path] = new_node
 
@@ -133,6 +157,10 @@ class Tree:
         if norm.lower() == "root":
             return self.root
         if norm.lower().startswith("root" + os.path.sep):
+            # Fast path: the whole chain already exists (siblings share parents)
+            existing: TreeNode | None = self.node_lookup.get(norm.lower())
+            if existing is not None:
+                return existing
             parts = [p for p in norm.split(os.path.sep) if p]
             # parts[0] is 'root'; build from parts[1:]
             current_node: TreeNode = self.root
@@ -144,6 +172,7 @@ class Tree:
                 if node is None:
                     node = TreeNode(name=node_name, path=built_path)
                     current_node.add_child(node)
+                    self.invalidate_structure()
                     self.node_lookup[node_name] = node
                     self.path_lookup[built_path] = node
                 current_node = node
@@ -171,6 +200,11 @@ class Tree:
                 # Relative path => reject (we do not support)
                 raise ValueError(f"Relative paths not supported: {path}")
 
+        # Fast path: the walk below would end on this node if it already exists
+        existing = self.node_lookup.get(self.convert_path_to_tree_format(norm))
+        if existing is not None:
+            return existing
+
         current_node = self.root
 
         for segment in parts[start_index:]:
@@ -184,6 +218,7 @@ class Tree:
             if node is None:
                 node = TreeNode(name=node_name, path=next_path)
                 current_node.add_child(node)
+                self.invalidate_structure()
                 self.node_lookup[node_name] = node
                 self.path_lookup[next_path] = node
 
@@ -237,17 +272,7 @@ class Tree:
         return lookup_dict.get(name)
 
     def get_nodes_at_level(self, target_level: int) -> list[TreeNode]:
-        result: list[TreeNode] = []
-
-        def traverse(node: TreeNode) -> None:
-            if node.level == target_level:
-                result.append(node)
-                return
-            for c in node.children:
-                traverse(c)
-
-        traverse(self.root)
-        return result
+        return self.root.get_nodes_at_level(target_level)
 
     def calculate_level(self, path: str) -> int:
         return len([c for c in path.split(os.path.sep) if c])
@@ -255,10 +280,13 @@ class Tree:
     def count_branches(self, node: TreeNode) -> tuple[int, int]:
         if not node:
             return 0, 0
-        branches: Literal[1] | Literal[0] = 1 if node.images else 0
-        images: int = len(node.images) if node.images else 0
-        for child in node.children:
-            b, i = self.count_branches(child)
-            branches += b
-            images += i
+        branches = 0
+        images = 0
+        stack: list[TreeNode] = [node]
+        while stack:
+            current = stack.pop()
+            if current.images:
+                branches += 1
+                images += len(current.images)
+            stack.extend(current.children)
         return branches, images
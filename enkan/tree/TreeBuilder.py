@@ -111,12 +111,16 @@ class TreeBuilder:
         pbar: tqdm,
     ) -> None:
         """
-        Walk a root directory using recursive os.scandir calls.
+        Walk a root directory with os.scandir and an explicit stack.
         """
         filters: Filters = self.tree.filters
         dont_recurse_globally: bool = self.tree.defaults.dont_recurse
 
-        def recurse(current_path: str) -> None:
+        # Directories are popped in the same pre-order a recursive walk would
+        # visit them: children are pushed reversed, after their parent is done
+        stack: List[str] = [root]
+        while stack:
+            current_path: str = stack.pop()
             result: Literal[1] | Literal[2] | Literal[3] | Literal[0] = filters.passes(
                 current_path
             )
@@ -124,7 +128,7 @@ class TreeBuilder:
             should_descend: bool = not (result in (1, 3) or dont_recurse_globally)
 
             if not should_process and not should_descend:
-                return
+                continue
 
             files: List[str] = []
             dirs: List[str] = []
@@ -142,23 +146,21 @@ class TreeBuilder:
                         except OSError:
                             continue
             except (PermissionError, FileNotFoundError, NotADirectoryError):
-                return
+                continue
 
             if should_process:
                 file_count: int = len(files)
                 if file_count:
                     pbar.total += file_count
                     pbar.desc = f"Processing {current_path}"
+                    # update() redraws at most every mininterval; no forced refresh
                     pbar.update(file_count)
-                    pbar.refresh()
                 self.process_path(current_path, files, dirs, data)
 
             if should_descend:
-                for dir_name in dirs:
-                    child_path = os.path.join(current_path, dir_name)
-                    recurse(child_path)
-
-        recurse(root)
+                stack.extend(
+                    os.path.join(current_path, dir_name) for dir_name in reversed(dirs)
+                )
 
     def process_path(
         self,
@@ -177,8 +179,8 @@ class TreeBuilder:
         images: List[str] = utils.filter_valid_files(
             path,
             files,
-            self.tree.filters.ignored_files,
-            include_video,
+            video_allowed=include_video,
+            ignored_names=self.tree.filters.ignored_names_in(path),
         )
         if not images:
             return
@@ -204,8 +206,15 @@ class TreeBuilder:
             data.get("video"), self.tree.defaults
         )
 
-        def recurse(current_path: str) -> List[str]:
-            collected: List[str] = []
+        pbar.desc = f"Flattening {path}"
+        pbar.refresh()
+
+        # Explicit stack, subdirectories pushed reversed, so images and
+        # traversed paths are collected in the same pre-order as a recursive walk
+        images: List[str] = []
+        stack: List[str] = [path]
+        while stack:
+            current_path: str = stack.pop()
             files_in_current: List[str] = []
             subdirs: List[str] = []
 
@@ -225,25 +234,16 @@ class TreeBuilder:
                         except OSError:
                             continue
             except (PermissionError, FileNotFoundError, NotADirectoryError):
-                return collected
+                continue
 
             if files_in_current:
                 traversed_paths.append(current_path)
                 count: int = len(files_in_current)
                 pbar.total += count
                 pbar.update(count)
-                pbar.refresh()
-                collected.extend(files_in_current)
-
-            for subdir in subdirs:
-                collected.extend(recurse(subdir))
-
-            return collected
-
-        pbar.desc = f"Flattening {path}"
-        pbar.refresh()
+                images.extend(files_in_current)
 
-        images: List[str] = recurse(path)
+            stack.extend(reversed(subdirs))
 
         node: TreeNode | None = self.tree.path_lookup.get(path)
         if node:
@@ -266,8 +266,7 @@ class TreeBuilder:
             )
 
         flattened_node = self.tree.path_lookup[path]
-        for dir_path in traversed_paths:
-            self.tree.path_lookup[dir_path] = flattened_node
+        self.tree.path_lookup.update(dict.fromkeys(traversed_paths, flattened_node))
 
     def add_images_branch(
         self,
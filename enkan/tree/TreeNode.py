@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Any, List, Optional
+import sys
+from typing import Any, Iterator, List, Optional
 
 
 class TreeNode:
@@ -29,15 +30,20 @@ class TreeNode:
         images: Optional[List[str]] = None,
         parent: Optional["TreeNode"] = None,
     ) -> None:
-        self.name: str = name
-        self.path: str = path
+        # Names and paths recur as lookup keys and as prefixes of their
+        # children's, so share one string object per distinct value
+        self.name: str = sys.intern(name)
+        self.path: str = sys.intern(path)
         self.proportion: Optional[float] = proportion
         self.weight: Optional[float] = None
         self.weight_modifier: int = weight_modifier
         self.is_percentage: bool = is_percentage
         self.mode_modifier: Any = mode_modifier
         self.flat: bool = flat
-        self.images: List[str] = list(images) if images else []
+        # Callers hand over freshly built lists, so keep them rather than copy
+        self.images: List[str] = (
+            images if isinstance(images, list) else list(images or ())
+        )
         self.children: List["TreeNode"] = []
         self.parent: Optional["TreeNode"] = parent
 
@@ -62,19 +68,33 @@ class TreeNode:
         child_node.parent = self
         self.children.append(child_node)
 
+    def iter_preorder(self) -> Iterator["TreeNode"]:
+        """
+        Yield this node and its descendants in pre-order (parents before
+        children, siblings in insertion order), without recursion.
+        """
+        stack: List["TreeNode"] = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            # Reversed so the leftmost child is popped first
+            stack.extend(reversed(node.children))
+
     def find_node(self, name: str) -> Optional["TreeNode"]:
-        if self.name == name:
-            return self
-        for child in self.children:
-            found = child.find_node(name)
-            if found:
-                return found
+        for node in self.iter_preorder():
+            if node.name == name:
+                return node
         return None
 
     def get_nodes_at_level(self, target_level: int) -> List["TreeNode"]:
         result: List["TreeNode"] = []
-        if self.level == target_level:
-            result.append(self)
-        for child in self.children:
-            result.extend(child.get_nodes_at_level(target_level))
+        # Track depth alongside each node instead of re-walking parents for
+        # every node's level; nothing below the target level can match.
+        stack: List[tuple["TreeNode", int]] = [(self, self.level)]
+        while stack:
+            node, level = stack.pop()
+            if level == target_level:
+                result.append(node)
+            elif level < target_level:
+                stack.extend((c, level + 1) for c in reversed(node.children))
         return result
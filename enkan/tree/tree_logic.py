@@ -1,6 +1,7 @@
 from __future__ import annotations
 import logging
-from typing import Callable, Literal, Mapping, Optional, Sequence, Tuple, List
+from itertools import repeat
+from typing import Callable, Iterable, Literal, Mapping, Optional, Sequence, Tuple, List
 
 from .Tree import Tree
 from .TreeBuilder import TreeBuilder
@@ -23,8 +24,7 @@ def build_tree(
     tree = Tree(defaults, filters)
     builder = TreeBuilder(tree)
     builder.build_tree(image_dirs, specific_images, quiet)
-    _, num_images = tree.count_branches(tree.root)
-    if num_images == 0:
+    if not any(node.images for node in tree.preorder()):
         raise ValueError("No images found in the provided input files.")
     calculate_weights(tree)
     return tree
@@ -76,17 +76,21 @@ def calculate_weights(tree: Tree) -> None:
 
         mode_modifier = node.mode_modifier or mode_modifier
         child_level = node.level + 1
-        child_mode, slope = resolve_mode(
-            tree.defaults.mode | (node.children[0].mode_modifier or {}), child_level
-        )
+        child_mode_modifier = node.children[0].mode_modifier
+        if child_mode_modifier:
+            child_mode, slope = resolve_mode(
+                tree.defaults.mode | child_mode_modifier, child_level
+            )
+        else:
+            child_mode, slope = resolve_mode(
+                tree.defaults.mode, child_level, tree.defaults.lowest_rung
+            )
 
         children: List[TreeNode] = _fill_missing_proportions(
             node.children,
             child_mode,
             slope,
-            count_fn=(
-                (lambda n: tree.count_branches(n)[1]) if child_mode == "w" else None
-            ),
+            count_fn=subtree_images.__getitem__ if child_mode == "w" else None,
         )
 
         for child in children:
@@ -169,7 +173,15 @@ def calculate_weights(tree: Tree) -> None:
                     n.proportion *= factor
         return nodes
 
-    lowest_rung: int = tree.filters.lowest_rung if tree.filters.lowest_rung is not None else min(tree.defaults.mode.keys())
+    # Images at or below each node, summed bottom-up in one pass so weighted
+    # levels don't re-walk every child's subtree to count them
+    subtree_images: dict[TreeNode, int] = {}
+    for node in reversed(tree.preorder()):
+        subtree_images[node] = len(node.images) + sum(
+            subtree_images[child] for child in node.children
+        )
+
+    lowest_rung: int = tree.filters.lowest_rung if tree.filters.lowest_rung is not None else tree.defaults.lowest_rung
     starting_nodes: List[TreeNode] = tree.get_nodes_at_level(lowest_rung) or [tree.root]
 
     mode, slope = resolve_mode(tree.defaults.mode, lowest_rung)
@@ -178,18 +190,14 @@ def calculate_weights(tree: Tree) -> None:
         starting_nodes,
         mode,
         slope,
-        count_fn=(lambda n: tree.count_branches(n)[1]) if mode == "w" else None,
+        count_fn=subtree_images.__getitem__ if mode == "w" else None,
     )
 
-    offending: List[TreeNode] = []
-
-    def _collect_with_images_below_lowest_rung(node: TreeNode) -> None:
-        if node.level < lowest_rung and node.images:
-            offending.append(node)
-        for child in node.children:
-            _collect_with_images_below_lowest_rung(child)
-
-    _collect_with_images_below_lowest_rung(tree.root)
+    offending: List[TreeNode] = [
+        node
+        for node in tree.preorder()
+        if node.images and node.level < lowest_rung
+    ]
 
     if offending:
         details = "\n  ".join(sorted(n.path or n.name for n in offending))
@@ -215,7 +223,7 @@ def extract_image_paths_and_weights_from_tree(
     tree: Tree, start_node: TreeNode = None, test_iterations: int = None
 ) -> tuple[list[str], list[float]]:
     """
-    Recursively extract all image file paths and their associated normalized weights from the tree.
+    Extract all image file paths and their associated normalized weights from the tree.
 
     This function traverses the tree starting from the root node, collecting all image paths and
     calculating a normalized weight for each image based on the node's weight and the number of images
@@ -235,24 +243,23 @@ def extract_image_paths_and_weights_from_tree(
     all_images: List[str] = []
     weights: List[float] = []
 
-    # Helper function to recursively gather data
-    def traverse_node(node: Optional[TreeNode]) -> None:
-        if not node:
-            return
+    if start_node is None or start_node is tree.root:
+        # The whole tree: reuse its cached pre-order node list
+        nodes: Iterable[TreeNode] = tree.preorder()
+    else:
+        nodes = start_node.iter_preorder()
+
+    for node in nodes:
         num_images = len(node.images)
         if num_images:
             normalised_weight = node.weight / (
                 num_images if node.is_percentage else node.weight_modifier
             )
             target_value = node.name if test_iterations is not None else None
-            for img in node.images:
-                all_images.append(target_value or img)
-                weights.append(normalised_weight)
-        for child in node.children:
-            traverse_node(child)
-
-    if start_node is None:
-        start_node = tree.root
-    traverse_node(start_node)
+            if target_value:
+                all_images.extend(repeat(target_value, num_images))
+            else:
+                all_images.extend(node.images)
+            weights.extend(repeat(normalised_weight, num_images))
 
     return all_images, weights
@@ -1,10 +1,11 @@
 import re
 
+# One mode token: b/w, level, then up to two optional slopes
+_MODE_TOKEN_PATTERN = re.compile(r"([bw])(\d+)(?:,(-?\d+))?(?:,(-?\d+))?", re.IGNORECASE)
+
 
 def parse_mode_string(mode_str):
-    # Updated regex: ([bw])(\d+)(?:,(-?\d+))?(?:,(-?\d+))?
-    pattern = re.compile(r"([bw])(\d+)(?:,(-?\d+))?(?:,(-?\d+))?", re.IGNORECASE)
-    matches = pattern.findall(mode_str)
+    matches = _MODE_TOKEN_PATTERN.findall(mode_str)
     # Each match is a tuple: (mode, level, slope1, slope2)
     # Convert level to int, slopes to int if present, else None
     result = {}
@@ -23,11 +24,13 @@ def parse_mode_string(mode_str):
     return result
 
 
-def resolve_mode(mode_dict, number):
+def resolve_mode(mode_dict, number, lowest=None):
     if not mode_dict:
         return ("w", [0, 0])  # Default to weighted mode, no slope
 
-    first_key = min(mode_dict.keys())
+    # Callers holding a precomputed lowest level (see Defaults.lowest_rung)
+    # pass it in to skip the min() over the keys.
+    first_key = lowest if lowest is not None else min(mode_dict.keys())
 
     if number < first_key:
         return ("l", [0, 0])
@@ -50,6 +53,11 @@ def resolve_mode(mode_dict, number):
 
 
 class Defaults:
+    # Cache for lowest_rung, declared at class level so Defaults pickled
+    # inside .tree files from before it existed still resolve it
+    _lowest_rung_mode = None
+    _lowest_rung = None
+
     def __init__(
         self,
         weight_modifier=100,
@@ -100,6 +108,15 @@ class Defaults:
         else:
             return self._mode
 
+    @property
+    def lowest_rung(self):
+        """Lowest level of the effective mode, recomputed only when the mode changes."""
+        mode = self.mode
+        if mode is not self._lowest_rung_mode:
+            self._lowest_rung_mode = mode
+            self._lowest_rung = min(mode.keys()) if mode else None
+        return self._lowest_rung
+
     @property
     def is_random(self):
         if self.args_is_random is not None:
@@ -1,6 +1,6 @@
 import os
 from enkan.utils.utils import level_of
-from typing import Mapping, Optional
+from typing import AbstractSet, Mapping, Optional
 
 class Filters:
     def __init__(self):
@@ -12,6 +12,33 @@ class Filters:
         self.dont_recurse_beyond = set()
         self.ignore_below_bottom = False
         self.lowest_rung: Optional[int] = None
+        self._build_normalized_indexes()
+        self._build_ignored_index()
+
+    def _build_normalized_indexes(self) -> None:
+        # normpath'd copies of the directory filters, so passes() can test
+        # membership instead of normalizing every entry on every call
+        self._ignored_dirs_norm = {os.path.normpath(d) for d in self.ignored_dirs}
+        self._dont_recurse_norm = {
+            os.path.normpath(d) for d in self.dont_recurse_beyond
+        }
+
+    def _build_ignored_index(self) -> None:
+        # Ignored files grouped by directory, so a directory listing can be
+        # checked by basename without scanning every ignored path
+        self._ignored_by_dir: dict[str, set[str]] = {}
+        for file in self.ignored_files:
+            self._index_ignored_file(file)
+
+    def _index_ignored_file(self, file) -> None:
+        directory, name = os.path.split(file)
+        self._ignored_by_dir.setdefault(directory, set()).add(name)
+
+    def __setstate__(self, state) -> None:
+        # Filters pickled inside older .tree files lack the derived indexes
+        self.__dict__.update(state)
+        self._build_normalized_indexes()
+        self._build_ignored_index()
 
     def preprocess_ignored_files(self):
         for ignored in self.ignored_files:
@@ -46,18 +73,32 @@ class Filters:
 
     def add_ignored_dir(self, directory):
         self.ignored_dirs.add(directory)
+        self._ignored_dirs_norm.add(os.path.normpath(directory))
 
     def add_ignored_file(self, file):
         self.ignored_files.add(file)
+        self._index_ignored_file(file)
+
+    def ignored_names_in(self, directory) -> AbstractSet[str]:
+        """Basenames of the ignored files directly inside ``directory``."""
+        names = self._ignored_by_dir.get(directory)
+        if names is None and directory.endswith(os.sep):
+            names = self._ignored_by_dir.get(directory.rstrip(os.sep))
+        return names or frozenset()
 
     def add_dont_recurse_beyond_folder(self, folder):
         self.dont_recurse_beyond.add(folder)
+        self._dont_recurse_norm.add(os.path.normpath(folder))
 
     def passes(self, path):
-        if any(
-            os.path.normpath(path) == os.path.normpath(ignored_dir)
-            for ignored_dir in self.ignored_dirs
-        ):
+        # Normalize once per call, and only if a directory filter is set
+        norm_path = (
+            os.path.normpath(path)
+            if self._ignored_dirs_norm or self._dont_recurse_norm
+            else path
+        )
+
+        if norm_path in self._ignored_dirs_norm:
             return 1
 
         if any(keyword in path for keyword in self.must_not_contain):
@@ -71,10 +112,7 @@ class Filters:
         if self._should_ignore_below_bottom(path):
             return 2
 
-        if any(
-            os.path.normpath(path) == os.path.normpath(dont_recurse_beyond_dir)
-            for dont_recurse_beyond_dir in self.dont_recurse_beyond
-        ):
+        if norm_path in self._dont_recurse_norm:
             return 3
 
         return 0
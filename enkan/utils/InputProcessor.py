@@ -1,5 +1,7 @@
 import os
-from typing import Dict, List, Any
+import re
+import sys
+from typing import Dict, List, Any, Iterable, Iterator, TextIO
 import logging
 from tqdm import tqdm
 
@@ -10,11 +12,42 @@ from enkan.utils.Defaults import parse_mode_string
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# Modifier patterns that can match a token, keyed by the token's first
+# (lower-cased) character, so each modifier is tried against one or two
+# candidate patterns instead of all of them in turn.
+_PATTERNS_BY_FIRST_CHAR: Dict[str, tuple[re.Pattern, ...]] = {
+    **dict.fromkeys("0123456789", (constants.WEIGHT_MODIFIER_PATTERN,)),
+    "%": (constants.PROPORTION_PATTERN,),
+    "g": (constants.GRAFT_PATTERN,),
+    ">": (constants.GROUP_PATTERN,),
+    "b": (constants.MODE_PATTERN,),
+    "w": (constants.MODE_PATTERN,),
+    "f": (constants.FLAT_PATTERN,),
+    "v": (constants.VIDEO_PATTERN,),
+    "n": (constants.NO_VIDEO_PATTERN, constants.NO_MUTE_PATTERN),
+    "m": (constants.MUTE_PATTERN,),
+    "/": (constants.DONT_RECURSE_PATTERN,),
+    "i": (constants.IGNORE_BELOW_BOTTOM_PATTERN,),
+}
+
+# Extensions of files that process_entry loads as inputs rather than parses
+_INPUT_FILE_EXTENSIONS: tuple[str, ...] = (".tree",) + constants.TEXT_FILES
+
 class InputProcessor:
     def __init__(self, defaults, filters, quiet=False):
         self.defaults = defaults
         self.filters = filters
         self.quiet = quiet
+        self._input_file_cache: Dict[str, str | None] = {}
+        self._dir_cache: Dict[str, Dict[str, os.DirEntry]] = {}
+        self._path_kind_cache: Dict[str, tuple[bool, bool]] = {}
+        self._expanded: set[str] = set()
+        self._modifier_pool: Dict[tuple[bool, tuple[str, ...]], Dict[str, Any]] = {}
+        # List-file loaders keyed by lower-cased extension
+        self._list_handlers = {
+            ".lst": self._load_slide_list,
+            ".txt": self._expand_text_file,
+        }
 
     def process_inputs(self, input_files, recdepth=1):
         """
@@ -44,14 +77,16 @@ class InputProcessor:
         """
         Attempt to load a pickled Tree; return None if version missing/outdated.
         """
-        from enkan.utils.utils import load_tree_from_file
         try:
-            tree = load_tree_from_file(filename)
+            tree = utils.load_tree_from_file(filename)
         except Exception as e:
             logger.warning("[tree] Failed to load '%s': %s.", filename, e)
             return None
-        version_in_pickle = getattr(tree, "_pickle_version", None)
-        if version_in_pickle is None or version_in_pickle < Tree.PICKLE_VERSION:
+        if not isinstance(tree, Tree):
+            logger.warning("[tree] '%s' does not contain a tree.", filename)
+            return None
+        version_in_pickle = tree._pickle_version
+        if version_in_pickle < Tree.PICKLE_VERSION:
             tree_filename = os.path.basename(filename)
             txt_filename = os.path.splitext(tree_filename)[0] + ".txt"
             logger.info(
@@ -65,6 +100,74 @@ class InputProcessor:
             return None
         return tree
 
+    def _find_input_file(self, entry: str) -> str | None:
+        """
+        Resolve an entry to a .tree/.lst/.txt file, memoized per entry so that
+        entries referenced more than once do not re-probe every search location.
+        """
+        try:
+            return self._input_file_cache[entry]
+        except KeyError:
+            # A bare name has no directory of its own to add (it would only
+            # repeat the cwd probe)
+            entry_dir = os.path.dirname(entry)
+            found = utils.find_input_file(entry, (entry_dir,) if entry_dir else ())
+            self._input_file_cache[entry] = found
+            return found
+
+    def _classify_path(self, path: str) -> tuple[bool, bool]:
+        """
+        Return (is_dir, is_file) for a path named in an input line.
+
+        The parent directory is listed once with os.scandir the first time any
+        of its children is seen; later siblings are classified from the cached
+        DirEntry objects instead of issuing their own stat calls. Names missing
+        from the listing (e.g. differing only in case) fall back to os.path.
+        Results are memoized per path, as the same entries recur across lists.
+        """
+        try:
+            return self._path_kind_cache[path]
+        except KeyError:
+            kind = self._path_kind_cache[path] = self._stat_path_kind(path)
+            return kind
+
+    def _stat_path_kind(self, path: str) -> tuple[bool, bool]:
+        """Uncached worker for _classify_path."""
+        parent, name = os.path.split(path)
+        if name:
+            parent = parent or "."
+            entries = self._dir_cache.get(parent)
+            if entries is None:
+                try:
+                    with os.scandir(parent) as it:
+                        entries = {e.name: e for e in it}
+                except OSError:
+                    entries = {}
+                self._dir_cache[parent] = entries
+            entry = entries.get(name)
+            if entry is not None:
+                return entry.is_dir(), entry.is_file()
+        if os.path.isdir(path):
+            return True, False
+        return False, os.path.isfile(path)
+
+    def _iter_lines(self, f: TextIO, filename: str) -> Iterable[str]:
+        """
+        Iterate the lines of an open input file, wrapped in a progress bar only
+        when one will actually be shown (not quiet, stderr is a terminal). The
+        line-count pre-pass needed for the bar's total is skipped otherwise.
+        """
+        if self.quiet or not sys.stderr.isatty():
+            return f
+        total_lines = sum(1 for _ in f)
+        f.seek(0)
+        return tqdm(
+            f,
+            desc=f"Parsing {filename}",
+            unit="line",
+            total=total_lines,
+        )
+
     def process_entry(
         self, entry, recdepth, image_dirs, specific_images, all_images, weights
     ) -> Tree | None:
@@ -72,106 +175,145 @@ class InputProcessor:
         Process a single input entry (file, directory, or image).
         """
 
-        additional_search_paths = [os.path.dirname(entry)]
-        input_filename_full = utils.find_input_file(entry, additional_search_paths)
+        # Only names that could be list/tree files are looked up as such; an
+        # entry naming an image (or a dotted directory) goes straight to parsing
+        entry_ext = os.path.splitext(entry)[1].lower()
+        input_filename_full = (
+            self._find_input_file(entry)
+            if not entry_ext or entry_ext in _INPUT_FILE_EXTENSIONS
+            else None
+        )
 
         if input_filename_full:
-            match os.path.splitext(input_filename_full)[1].lower():
-                case ".tree":
-                    # Load a pre-built tree from a file
-                    tree = self._load_tree_if_current(input_filename_full)
-                    if tree:
-                        logger.info("Loaded current tree from %s", input_filename_full)
-                        return tree
-                    stem = os.path.splitext(input_filename_full)[0]
-                    for ext in (".lst", ".txt"):
-                        alt = stem + ext
-                        if os.path.isfile(alt):
-                            # Reinvoke processing on the alternate file
-                            return self.process_entry(
-                                alt, recdepth, image_dirs, specific_images, all_images, weights
-                            )
+            ext = os.path.splitext(input_filename_full)[1].lower()
+            if ext == ".tree":
+                # Load a pre-built tree from a file
+                tree = self._load_tree_if_current(input_filename_full)
+                if tree:
+                    logger.info("Loaded current tree from %s", input_filename_full)
+                    return tree
+                stem = os.path.splitext(input_filename_full)[0]
+                for alt_ext in (".lst", ".txt"):
+                    alt = stem + alt_ext
+                    if os.path.isfile(alt):
+                        # Fall through to processing the alternate file
+                        input_filename_full, ext = alt, alt_ext
+                        break
+                else:
                     # If no alternate source list, just stop (nothing else to parse here)
-                    return None                
-                case ".lst":
-                    with open(
-                        input_filename_full, "r", buffering=65536, encoding="utf-8"
-                    ) as f:
-                        total_lines = sum(1 for _ in f)
-                        f.seek(0)
-                        for line in tqdm(
-                            f,
-                            desc=f"Parsing {input_filename_full}",
-                            unit="line",
-                            total=total_lines,
-                            disable=self.quiet,
-                        ):
-                            line = line.strip()
-                            if not line or line.startswith("#"):
-                                continue
-                            image_path, weight_str = line.rsplit(
-                                ",", 1
-                            )  # Split on last comma
-                            if weight_str:  # Expecting "image_path,weight"
-                                try:
-                                    weights.append(float(weight_str))
-                                    all_images.append(image_path)
-                                except ValueError:
-                                    # weight_str is not a number, so it's part of the image path (comma in filename)
-                                    all_images.append(f"{image_path},{weight_str}")
-                                    weights.append(
-                                        0.01
-                                    )  # Default weight for single lines
-                            else:  # Probably an irfanview-style list
-                                all_images.append(line)
-                                weights.append(0.01)  # Default weight for single lines
-                    logger.info("Loaded slide list from %s", input_filename_full)
-                case ".txt":
-                    with open(
-                        input_filename_full, "r", buffering=65536, encoding="utf-8"
-                    ) as f:
-                        total_lines = sum(1 for _ in f)
-                        f.seek(0)
-                        for line in tqdm(
-                            f,
-                            desc=f"Parsing {input_filename_full}",
-                            unit="line",
-                            total=total_lines,
-                            disable=self.quiet,
-                        ):
-                            line = line.strip()
-                            if not line or line.startswith(
-                                "#"
-                            ):  # Skip comments/empty lines
-                                continue
-                            line = line.replace(
-                                '"', ""
-                            ).strip()  # Remove enclosing quotes
-
-                            if utils.is_textfile(
-                                line
-                            ):  # Recursively process nested text files
-                                sub_image_dirs, sub_specific_images, _, _ = (
-                                    self.process_inputs([line], recdepth + 1)
-                                )
-                                image_dirs.update(sub_image_dirs)
-                                specific_images.update(sub_specific_images)
-                            else:
-                                path, modifier_list = self.parse_input_line(
-                                    line, recdepth
-                                )
-                                if modifier_list:
-                                    if utils.is_imagefile(path):
-                                        specific_images[path] = modifier_list
-                                    else:
-                                        image_dirs[path] = modifier_list
+                    return None
+            # Each list file is read at most once per run, however often
+            # it is named (on the command line or from other lists)
+            real_path = os.path.realpath(input_filename_full)
+            if real_path in self._expanded:
+                logger.debug("Skipping %s: already loaded.", input_filename_full)
+                return None
+            handler = self._list_handlers.get(ext)
+            if handler:
+                self._expanded.add(real_path)
+                handler(
+                    input_filename_full,
+                    recdepth,
+                    image_dirs,
+                    specific_images,
+                    all_images,
+                    weights,
+                )
         else:  # Handle directories and images directly
             path, modifier_list = self.parse_input_line(entry, recdepth)
-            if modifier_list:
-                if utils.is_imagefile(path):
-                    specific_images[path] = modifier_list
-                else:
-                    image_dirs[path] = modifier_list
+            self._add_parsed_entry(path, modifier_list, image_dirs, specific_images)
+
+    def _load_slide_list(
+        self, filename, recdepth, image_dirs, specific_images, all_images, weights
+    ) -> None:
+        """Parse a .lst slide list of "image_path,weight" lines."""
+        add_image = all_images.append
+        add_weight = weights.append
+        with open(
+            filename,
+            "r",
+            buffering=constants.READ_BUFFER_SIZE,
+            encoding="utf-8",
+        ) as f:
+            for line in self._iter_lines(f, filename):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                image_path, sep, weight_str = line.rpartition(",")  # Split on last comma
+                if sep and weight_str:  # Expecting "image_path,weight"
+                    try:
+                        weight = float(weight_str)
+                    except ValueError:
+                        # weight_str is not a number, so it's part of the image path (comma in filename)
+                        add_image(line)
+                        add_weight(0.01)  # Default weight for single lines
+                    else:
+                        add_image(image_path)
+                        add_weight(weight)
+                else:  # Probably an irfanview-style list
+                    add_image(line)
+                    add_weight(0.01)  # Default weight for single lines
+        logger.info("Loaded slide list from %s", filename)
+
+    def _read_lines(self, filename: str) -> Iterator[str]:
+        """Yield the lines of a text input, closing the file once exhausted."""
+        with open(
+            filename, "r", buffering=constants.READ_BUFFER_SIZE, encoding="utf-8"
+        ) as f:
+            yield from self._iter_lines(f, filename)
+
+    def _expand_text_file(
+        self, filename, recdepth, image_dirs, specific_images, all_images, weights
+    ) -> None:
+        """
+        Parse a .txt input together with every list file it includes.
+
+        Includes are expanded depth-first from an explicit stack of line
+        iterators rather than by recursion, so nesting depth is not bounded by
+        the interpreter's recursion limit. Each list file is expanded at most
+        once per run, which also breaks include cycles.
+        """
+        self._expanded.add(os.path.realpath(filename))
+        stack: List[tuple[Iterator[str], int]] = [(self._read_lines(filename), recdepth)]
+        while stack:
+            lines, depth = stack[-1]
+            line = next(lines, None)
+            if line is None:
+                stack.pop()
+                continue
+            line = line.strip()
+            if not line or line.startswith("#"):  # Skip comments/empty lines
+                continue
+            if '"' in line:
+                line = line.replace('"', "").strip()  # Remove enclosing quotes
+
+            if not utils.is_textfile(line):
+                path, modifier_list = self.parse_input_line(line, depth)
+                self._add_parsed_entry(path, modifier_list, image_dirs, specific_images)
+                continue
+
+            # Nested list file: expand once, one level deeper
+            nested = self._find_input_file(line)
+            if nested and nested.lower().endswith(".txt"):
+                real = os.path.realpath(nested)
+                if real in self._expanded:
+                    continue
+                self._expanded.add(real)
+                stack.append((self._read_lines(nested), depth + 1))
+                continue
+            # Other list files are loaded (and deduplicated) by process_entry
+            self.process_entry(
+                line, depth + 1, image_dirs, specific_images, all_images, weights
+            )
+
+    @staticmethod
+    def _add_parsed_entry(path, modifier_list, image_dirs, specific_images) -> None:
+        """Store a parsed (path, modifiers) pair as a specific image or a directory."""
+        if modifier_list:
+            if utils.is_imagefile(path):
+                specific_images[path] = modifier_list
+            else:
+                image_dirs[path] = modifier_list
 
     def parse_input_line(self, line, recdepth):
 
@@ -188,7 +330,7 @@ class InputProcessor:
         elif line.startswith("[-]"):
             path_or_keyword: str = line[3:].strip()
             if os.path.isabs(path_or_keyword):
-                if os.path.isfile(path_or_keyword):
+                if self._classify_path(path_or_keyword)[1]:
                     self.filters.add_ignored_file(path_or_keyword)
                 else:
                     self.filters.add_ignored_dir(path_or_keyword)
@@ -199,10 +341,14 @@ class InputProcessor:
         # Strip quotes early (if users quote paths)
         line = line.replace('"', "").strip()
 
-        # Extract all modifiers
-        modifiers = constants.MODIFIER_PATTERN.findall(line)
-        # Remove all modifiers from the line to get the path
-        path = constants.MODIFIER_PATTERN.sub("", line).strip()
+        # Extract all modifiers, skipping both regex scans for plain paths
+        if "[" in line:
+            modifiers = constants.MODIFIER_CONTENT_PATTERN.findall(line)
+            # Remove all modifiers from the line to get the path
+            path = constants.MODIFIER_CONTENT_PATTERN.sub("", line).strip()
+        else:
+            modifiers = ()
+            path = line
 
         # Defaults/state container (handlers mutate this)
         # Can be global: video, mute, mode_modifier, dont_recurse
@@ -266,27 +412,26 @@ class InputProcessor:
         def handle_ignore_below_bottom(_s: str):
             state["ignore_below_bottom"] = True
 
-        # Ordered list of (pattern, handler)
-        HANDLERS = (
-            (constants.WEIGHT_MODIFIER_PATTERN, handle_weight),
-            (constants.PROPORTION_PATTERN, handle_proportion),
-            (constants.GRAFT_PATTERN, handle_graft),
-            (constants.GROUP_PATTERN, handle_group),
-            (constants.MODE_PATTERN, handle_mode),
-            (constants.FLAT_PATTERN, handle_flat),
-            (constants.VIDEO_PATTERN, handle_video),
-            (constants.NO_VIDEO_PATTERN, handle_no_video),
-            (constants.MUTE_PATTERN, handle_mute),
-            (constants.NO_MUTE_PATTERN, handle_no_mute),
-            (constants.DONT_RECURSE_PATTERN, handle_dont_recurse),
-            (constants.IGNORE_BELOW_BOTTOM_PATTERN, handle_ignore_below_bottom),
-        )
+        # pattern -> handler
+        HANDLERS = {
+            constants.WEIGHT_MODIFIER_PATTERN: handle_weight,
+            constants.PROPORTION_PATTERN: handle_proportion,
+            constants.GRAFT_PATTERN: handle_graft,
+            constants.GROUP_PATTERN: handle_group,
+            constants.MODE_PATTERN: handle_mode,
+            constants.FLAT_PATTERN: handle_flat,
+            constants.VIDEO_PATTERN: handle_video,
+            constants.NO_VIDEO_PATTERN: handle_no_video,
+            constants.MUTE_PATTERN: handle_mute,
+            constants.NO_MUTE_PATTERN: handle_no_mute,
+            constants.DONT_RECURSE_PATTERN: handle_dont_recurse,
+            constants.IGNORE_BELOW_BOTTOM_PATTERN: handle_ignore_below_bottom,
+        }
 
-        for mod in modifiers:
-            mod_content = mod.strip("[]").strip()
-            for pattern, func in HANDLERS:
-                if pattern.match(mod_content):
-                    func(mod_content)
+        for mod_content in modifiers:
+            for pattern in _PATTERNS_BY_FIRST_CHAR.get(mod_content[:1].lower(), ()):
+                if pattern.fullmatch(mod_content):
+                    HANDLERS[pattern](mod_content)
                     break
             else:
                 logger.warning("Unknown modifier '%s' in line: %s", mod_content, line)
@@ -309,19 +454,16 @@ class InputProcessor:
                 self.filters.configure_ignore_below_bottom(True, self.defaults.mode)
             return None, None
 
-        if os.path.isdir(path):
-            return path, {
-                "weight_modifier": state["weight_modifier"],
-                "is_percentage": state["is_percentage"],
-                "proportion": state["proportion"],
-                "graft_level": state["graft_level"],
-                "group": state["group"],
-                "mode_modifier": state["mode_modifier"],
-                "flat": state["flat"],
-                "video": state["video"],
-            }
-        elif os.path.isfile(path):
-            return path, {
+        is_dir, is_file = self._classify_path(path)
+        if not (is_dir or is_file):
+            logger.warning("Path '%s' is neither a file nor a directory.", path)
+            return None, None
+
+        # Lines with the same modifiers share one (read-only) record
+        pool_key = (is_dir, tuple(modifiers))
+        record = self._modifier_pool.get(pool_key)
+        if record is None:
+            record = {
                 "weight_modifier": state["weight_modifier"],
                 "is_percentage": state["is_percentage"],
                 "proportion": state["proportion"],
@@ -329,7 +471,8 @@ class InputProcessor:
                 "group": state["group"],
                 "mode_modifier": state["mode_modifier"],
             }
-        else:
-            logger.warning("Path '%s' is neither a file nor a directory.", path)
-
-        return None, None
+            if is_dir:
+                record["flat"] = state["flat"]
+                record["video"] = state["video"]
+            self._modifier_pool[pool_key] = record
+        return path, record
@@ -1,5 +1,9 @@
 import logging
 
+# basicConfig is a no-op once the root logger has handlers, so later calls
+# would only repeat the lock/handler scan; remember that setup has run.
+_configured: bool = False
+
 def configure_logging(debug: bool = False, quiet: bool = False) -> None:
     """
     Set up root logger.
@@ -7,6 +11,10 @@ def configure_logging(debug: bool = False, quiet: bool = False) -> None:
     quiet=True  -> only WARN+
     default     -> INFO
     """
+    global _configured
+    if _configured:
+        return
+    _configured = True
     level = logging.WARNING if quiet else (logging.DEBUG if debug else logging.INFO)
     logging.basicConfig(
         level=level,
@@ -12,7 +12,12 @@ class Stack:
                                       If None, the stack size is unlimited.
         """
         self.max_size = max_size
-        self.stack = []
+        # Parallel columns rather than one list of (root, listA, listB)
+        # tuples: pushes allocate no tuple, and read_top touches only roots.
+        self._roots = []
+        self._lists_a = []
+        self._lists_b = []
+        self._len = 0
 
     def push(self, root, listA, listB):
         """
@@ -22,8 +27,11 @@ class Stack:
             listA (list): The first list to be pushed onto the stack.
             listB (list): The second list to be pushed onto the stack.
         """
-        if self.max_size is None or len(self.stack) < self.max_size:
-            self.stack.append((root, listA, listB))
+        if self.max_size is None or self._len < self.max_size:
+            self._roots.append(root)
+            self._lists_a.append(listA)
+            self._lists_b.append(listB)
+            self._len += 1
         else:
             logger.debug("Stack is full. Cannot push more items.")
 
@@ -34,30 +42,34 @@ class Stack:
         Returns:
             tuple: A tuple containing the two lists that were on top of the stack.
         """
-        if self.stack:
-            return self.stack.pop()
+        if self._len:
+            self._len -= 1
+            return self._roots.pop(), self._lists_a.pop(), self._lists_b.pop()
         else:
             logger.debug("Stack is empty. Cannot pop items.")
             return None, None, None  # Return empty lists if the stack is empty
 
     def read_top(self, index=1):
-        if self.stack:
-            return self.stack[len(self.stack) - index][0]
+        if self._len:
+            return self._roots[self._len - index]
 
     def clear(self):
         """Clear the stack."""
-        self.stack.clear()
+        self._roots.clear()
+        self._lists_a.clear()
+        self._lists_b.clear()
+        self._len = 0
 
     def len(self):
-        return len(self.stack)
+        return self._len
 
     def is_empty(self):
         """Check if the stack is empty."""
-        return len(self.stack) == 0
+        return self._len == 0
 
     def is_full(self):
         """Check if the stack is full."""
         if self.max_size is None:
             return False
-        return len(self.stack) >= self.max_size
+        return self._len >= self.max_size
 
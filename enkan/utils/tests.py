@@ -8,11 +8,14 @@ from tqdm import tqdm
 
 from enkan.constants import TOTAL_WEIGHT
 from enkan.utils.Defaults import resolve_mode
-from enkan.utils.utils import weighted_choice
+from enkan.utils.utils import weighted_choices
 from enkan.tree.TreeNode import TreeNode
 
 logger: logging.Logger = logging.getLogger("enkan.tests")
 
+# Samples drawn per batch in test_distribution (also the progress-bar step)
+TEST_BATCH_SIZE = 10_000
+
 
 def timeit(func):
     @wraps(func)
@@ -68,12 +71,18 @@ def test_distribution(
     image_nodes, cum_weights, iterations, testdepth, histo, defaults, quiet=False
 ):
     hit_counts = defaultdict(int)
-    for _ in tqdm(range(iterations), desc="Iterating tests", disable=quiet):
-        if defaults.is_random:
-            image_path = random.choice(image_nodes)
-        else:
-            image_path = weighted_choice(image_nodes, cum_weights)
-        hit_counts["\\".join(image_path.split("\\")[:testdepth])] += 1
+    with tqdm(total=iterations, desc="Iterating tests", disable=quiet) as pbar:
+        remaining = iterations
+        while remaining > 0:
+            batch = min(remaining, TEST_BATCH_SIZE)
+            if defaults.is_random:
+                sample = random.choices(image_nodes, k=batch)
+            else:
+                sample = weighted_choices(image_nodes, cum_weights, batch)
+            for image_path in sample:
+                hit_counts["\\".join(image_path.split("\\")[:testdepth])] += 1
+            pbar.update(batch)
+            remaining -= batch
 
     directory_counts = defaultdict(int)
     for path, count in hit_counts.items():
@@ -4,8 +4,8 @@ import os
 import bisect
 import random
 from datetime import datetime
-from pathlib import Path
-from typing import Iterable, Sequence, List, Set, Optional, TYPE_CHECKING
+from itertools import islice
+from typing import AbstractSet, Iterable, Sequence, List, Set, Optional, TYPE_CHECKING
 
 from enkan import constants
 
@@ -28,19 +28,52 @@ def weighted_choice(image_paths: Sequence[str], cum_weights: Sequence[float]) ->
     Raises:
         ValueError: If inputs are empty or lengths mismatch.
     """
-    if not image_paths or not cum_weights:
+    n = len(image_paths)
+    if not n or not cum_weights:
         raise ValueError("weighted_choice received empty inputs")
-    if len(image_paths) != len(cum_weights):
+    if n != len(cum_weights):
         raise ValueError("image_paths and cum_weights length mismatch")
     total = cum_weights[-1]
     if total <= 0:
         raise ValueError("Total cumulative weight must be > 0")
     x = random.random() * total  # marginally cheaper than uniform(0, total)
-    idx = bisect.bisect_left(cum_weights, x)
-    # Clamp (in pathological float edge)
-    if idx >= len(image_paths):
-        idx = len(image_paths) - 1
-    return image_paths[idx]
+    # x < total == cum_weights[-1], so bisect_right always lands in range,
+    # and never on a zero-weight entry (as random.choices does)
+    return image_paths[bisect.bisect_right(cum_weights, x)]
+
+
+def weighted_choices(
+    image_paths: Sequence[str], cum_weights: Sequence[float], k: int
+) -> List[str]:
+    """
+    Draw ``k`` image paths (with replacement) according to cumulative weights.
+
+    Batched counterpart of weighted_choice for bulk sampling: the draws are
+    made by random.choices in a single call instead of one Python-level call
+    per sample.
+
+    Raises:
+        ValueError: If inputs are empty, lengths mismatch or the total is not > 0.
+    """
+    if not image_paths or not cum_weights:
+        raise ValueError("weighted_choices received empty inputs")
+    if len(image_paths) != len(cum_weights):
+        raise ValueError("image_paths and cum_weights length mismatch")
+    if cum_weights[-1] <= 0:
+        raise ValueError("Total cumulative weight must be > 0")
+    return random.choices(image_paths, cum_weights=cum_weights, k=k)
+
+
+def _count_parts(path: str, sep: str) -> int:
+    """Number of non-empty ``sep``-separated components in ``path``."""
+    if sep + sep in path:
+        # Separator runs (UNC prefixes, stray doubles) need the general form
+        return sum(1 for part in path.split(sep) if part)
+    if not path:
+        return 0
+    return (
+        path.count(sep) + 1 - path.startswith(sep) - path.endswith(sep)
+    )
 
 
 def level_of(path: str) -> int:
@@ -53,7 +86,7 @@ def level_of(path: str) -> int:
     Returns:
         Number of non‑empty components.
     """
-    return sum(1 for part in path.split(os.sep) if part)
+    return _count_parts(path, os.sep)
 
 
 def truncate_path(path: str, levels_up: int) -> str:
@@ -69,15 +102,33 @@ def truncate_path(path: str, levels_up: int) -> str:
     Returns:
         Truncated path string (components rejoined with backslash).
     """
-    parts = [p for p in path.split("\\") if p]
+    sep = "\\"
+    if path.startswith(sep) or path.endswith(sep) or sep + sep in path:
+        # Empty components get dropped from the result, so rebuild it
+        if levels_up < 0:
+            # levels_up negative
+            keep = max(0, _count_parts(path, sep) + levels_up)
+        else:
+            keep = levels_up
+        return sep.join(islice(filter(None, path.split(sep)), keep))
+
+    # Well-formed path: the result is a prefix, found by scanning for
+    # separators rather than splitting and rejoining
     if levels_up < 0:
-        keep = len(parts) + levels_up  # levels_up negative
-        if keep < 0:
-            keep = 0
-        parts = parts[:keep]
-    else:
-        parts = parts[:levels_up]
-    return "\\".join(parts)
+        end = len(path)
+        for _ in range(-levels_up):
+            end = path.rfind(sep, 0, end)
+            if end == -1:
+                return ""
+        return path[:end]
+    if levels_up == 0:
+        return ""
+    start = -1
+    for _ in range(levels_up):
+        start = path.find(sep, start + 1)
+        if start == -1:
+            return path
+    return path[:start]
 
 
 def get_drive_or_root(path: str) -> str:
@@ -110,8 +161,22 @@ def contains_subdirectory(path: str) -> int | bool:
     """
     try:
         with os.scandir(path) as it:
-            dirs = [e for e in it if e.is_dir()]
-        return len(dirs) if dirs else False
+            count = sum(1 for e in it if e.is_dir())
+        return count or False
+    except OSError:
+        return False
+
+
+def has_subdirectory(path: str) -> bool:
+    """
+    Return True if a directory has at least one immediate child directory.
+
+    Stops at the first one found; use contains_subdirectory when the count
+    itself is needed.
+    """
+    try:
+        with os.scandir(path) as it:
+            return any(e.is_dir() for e in it)
     except OSError:
         return False
 
@@ -126,28 +191,49 @@ def contains_files(path: str) -> bool:
     Returns:
         True if at least one file found, else False.
     """
-    try:
-        for root, _, files in os.walk(path):
-            if files:
-                return True
-        return False
-    except OSError:
-        return False
+    # Depth-first over scandir so the first file found ends the search;
+    # DirEntry type checks reuse the directory listing instead of stat'ing
+    stack: List[str] = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        return True
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                except OSError:
+                    pass
+    return False
+
+
+# Only a name's tail can match an extension, so only that much is lower-cased
+_TEXT_SUFFIX_LEN: int = max(map(len, constants.TEXT_FILES))
 
 
 def is_textfile(file: str) -> bool:
     """Return True if filename has a text extension."""
-    return file.lower().endswith(constants.TEXT_FILES)
+    return file[-_TEXT_SUFFIX_LEN:].lower().endswith(constants.TEXT_FILES)
+
+
+# Lower-cased once here so each candidate needs only its own name lowered
+_IMAGE_EXTS: tuple[str, ...] = tuple(e.lower() for e in constants.IMAGE_FILES)
+_VIDEO_EXTS: tuple[str, ...] = tuple(e.lower() for e in constants.VIDEO_FILES)
+_MEDIA_EXTS: tuple[str, ...] = _IMAGE_EXTS + _VIDEO_EXTS
 
 
 def is_imagefile(file: str) -> bool:
     """Return True if filename has an image extension."""
-    return file.lower().endswith(constants.IMAGE_FILES)
+    return file.lower().endswith(_IMAGE_EXTS)
 
 
 def is_videofile(file: str) -> bool:
     """Return True if filename has a video extension."""
-    return file.lower().endswith(constants.VIDEO_FILES)
+    return file.lower().endswith(_VIDEO_EXTS)
 
 
 def is_videoallowed(data_video: bool | None, defaults) -> bool:
@@ -161,16 +247,32 @@ def is_videoallowed(data_video: bool | None, defaults) -> bool:
     """
     if data_video is False:
         return False
-    if getattr(defaults, "args_video", None) is not None:
+    if defaults.args_video is not None:
         return defaults.args_video
     return data_video if data_video is not None else defaults.video
 
 
+def _ignored_names_in(path: str, ignored_files: Iterable[str]) -> Set[str]:
+    """
+    Basenames of the ignored paths that sit directly in ``path``, so listings
+    can be checked by name without joining every entry onto the directory.
+    """
+    prefix = os.path.join(path, "")
+    cut = len(prefix)
+    return {
+        p[cut:]
+        for p in ignored_files
+        if p.startswith(prefix) and os.sep not in p[cut:]
+    }
+
+
 def filter_valid_files(
     path: str,
     files: Sequence[str],
-    ignored_files: Iterable[str],
+    ignored_files: Iterable[str] | None = None,
     video_allowed: bool | None = None,
+    *,
+    ignored_names: AbstractSet[str] | None = None,
 ) -> List[str]:
     """
     Filter a directory listing for valid image/video files, excluding ignored files.
@@ -178,22 +280,46 @@ def filter_valid_files(
     Args:
         path: Directory path.
         files: Filenames in the directory.
-        ignored_files: Iterable of full paths to ignore.
+        ignored_files: Iterable of full paths to ignore; may be omitted
+            when ignored_names is given.
         video_allowed: Whether videos may be included (pre-filtered).
+        ignored_names: Basenames to ignore in ``path``, already projected
+            (e.g. Filters.ignored_names_in); used instead of ignored_files.
 
     Returns:
         List of full paths (image/video only).
     """
-    ignored_set: Set[str] = set(ignored_files)
-    # If many files per directory & large ignored_set, this is fine O(n).
+    if ignored_names is None:
+        ignored_names = _ignored_names_in(path, ignored_files or ())
+    # Pick the suffixes once so each file needs a single endswith()
+    exts = _MEDIA_EXTS if video_allowed else _IMAGE_EXTS
     out: List[str] = []
     join = os.path.join
     for f in files:
-        full = join(path, f)
-        if full in ignored_set:
+        if f in ignored_names:
+            continue
+        if f.lower().endswith(exts):
+            # Join only the files that are kept
+            out.append(join(path, f))
+    return out
+
+
+def _filter_valid_entries(
+    entries: Iterable[os.DirEntry],
+    ignored_names: AbstractSet[str],
+    video_allowed: bool | None = None,
+) -> List[str]:
+    """
+    filter_valid_files for scandir entries: each DirEntry already carries its
+    full path, so nothing needs joining.
+    """
+    exts = _MEDIA_EXTS if video_allowed else _IMAGE_EXTS
+    out: List[str] = []
+    for entry in entries:
+        if entry.name in ignored_names:
             continue
-        if is_imagefile(f) or (video_allowed and is_videofile(f)):
-            out.append(full)
+        if entry.name.lower().endswith(exts):
+            out.append(entry.path)
     return out
 
 
@@ -205,23 +331,23 @@ def filtered_images_from_disk(
     ignored_files: Iterable[str] | None = None,
 ) -> List[str]:
     """Return the filtered media files that exist directly under ``path``."""
-    candidates: List[str] = []
-    try:
-        with os.scandir(path) as entries:
-            for entry in entries:
-                if entry.is_file():
-                    candidates.append(entry.name)
-    except OSError:
-        return []
-
+    ignored_names: AbstractSet[str]
     if ignored_files is not None:
-        effective_ignored = list(ignored_files)
+        ignored_names = _ignored_names_in(path, ignored_files)
     elif filters is not None:
-        effective_ignored = list(getattr(filters, 'ignored_files', []))
+        ignored_names = filters.ignored_names_in(path)
     else:
-        effective_ignored = []
+        ignored_names = frozenset()
 
-    return filter_valid_files(path, candidates, effective_ignored, include_video)
+    try:
+        with os.scandir(path) as entries:
+            return _filter_valid_entries(
+                (entry for entry in entries if entry.is_file()),
+                ignored_names,
+                include_video,
+            )
+    except OSError:
+        return []
 
 
 def images_from_path(
@@ -231,16 +357,22 @@ def images_from_path(
     include_video: bool = False,
     filters: "Filters" | None = None,
     ignored_files: Iterable[str] | None = None,
+    copy: bool = True,
 ) -> List[str]:
-    """Lookup images for ``path`` via tree cache; fall back to disk scan."""
+    """
+    Lookup images for ``path`` via tree cache; fall back to disk scan.
+
+    With ``copy=False`` a cached node's own image list is returned; callers
+    passing it must not mutate the result.
+    """
     if tree is not None:
-        lookup = getattr(tree, 'path_lookup', None)
-        if lookup is not None:
-            node = lookup.get(path) or lookup.get(os.path.normpath(path))
-            if node is not None:
-                node_images = getattr(node, 'images', None)
-                if node_images:
-                    return list(node_images)
+        lookup = tree.path_lookup
+        node = lookup.get(path)
+        if node is None:
+            # Normalise only when the path isn't already a key as given
+            node = lookup.get(os.path.normpath(path))
+        if node is not None and node.images:
+            return list(node.images) if copy else node.images
 
     return filtered_images_from_disk(
         path,
@@ -263,24 +395,34 @@ def find_input_file(
     Returns:
         Absolute path string if found, else None.
     """
-    add_paths: List[str] = list(additional_search_paths or [])
-    script_dir: Path = Path(__file__).resolve().parent
-    cwd: Path = Path.cwd()
-
-    possible_locations: List[Path] = [script_dir, cwd, *map(Path, add_paths), cwd / "lists"]
-
-    base = Path(input_filename)
-    ext: str = base.suffix.lower()
-    if not ext:
-        candidates: List[Path] = [base.with_suffix(".tree"), base.with_suffix(".lst"), base.with_suffix(".txt")]
+    # Plain string joins and isfile: only existence matters here, so no
+    # Path objects are built per candidate
+    script_dir: str = os.path.dirname(os.path.realpath(__file__))
+    cwd: str = os.getcwd()
+
+    possible_locations: List[str] = [
+        script_dir,
+        cwd,
+        *(additional_search_paths or ()),
+        os.path.join(cwd, "lists"),
+    ]
+
+    if not os.path.splitext(input_filename)[1]:
+        candidates: List[str] = [
+            input_filename + ".tree",
+            input_filename + ".lst",
+            input_filename + ".txt",
+        ]
     else:
-        candidates = [base]
+        candidates = [input_filename]
 
+    join = os.path.join
+    isfile = os.path.isfile
     for location in possible_locations:
         for cand in candidates:
-            candidate_path: Path = location / cand
-            if candidate_path.is_file():
-                return str(candidate_path)
+            candidate_path: str = join(location, cand)
+            if isfile(candidate_path):
+                return os.path.normpath(candidate_path)
     return None
 
 
@@ -308,10 +450,12 @@ def write_image_list(
         f"# Mode arguments: {mode_args}\n"
         "# Format: image_path,weight\n"
     )
-    with open(output_path, "w", encoding="utf-8") as f:
+    with open(
+        output_path, "w", encoding="utf-8", buffering=constants.WRITE_BUFFER_SIZE
+    ) as f:
         f.write(header)
-        for img, w in zip(all_images, weights):
-            f.write(f"{img},{w}\n")
+        # Rows are formatted and written from C; no per-row Python frame
+        f.writelines(map("{},{}\n".format, all_images, weights))
 
 
 def write_tree_to_file(tree, output_path: str | os.PathLike[str]) -> None:
@@ -323,8 +467,8 @@ def write_tree_to_file(tree, output_path: str | os.PathLike[str]) -> None:
         output_path: Destination file path.
     """
     import pickle
-    with open(output_path, "wb") as f:
-        pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(output_path, "wb", buffering=constants.WRITE_BUFFER_SIZE) as f:
+        pickle.dump(tree, f, protocol=constants.PICKLE_PROTOCOL)
 
 
 def load_tree_from_file(input_path: str | os.PathLike[str]):
@@ -338,5 +482,5 @@ def load_tree_from_file(input_path: str | os.PathLike[str]):
         Unpickled object (expected Tree).
     """
     import pickle
-    with open(input_path, "rb") as f:
+    with open(input_path, "rb", buffering=constants.READ_BUFFER_SIZE) as f:
         return pickle.load(f)
\ No newline at end of file